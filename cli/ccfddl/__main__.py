@@ -3,11 +3,27 @@ import requests
 import yaml
 from termcolor import colored
 from argparse import ArgumentParser
-from copy import deepcopy
 from datetime import datetime
 from tabulate import tabulate
 from datetime import timezone
 
+# Prefer libyaml's C loader when PyYAML is built with it
+Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# Fields of allconf.yml the deadline table never reads
+UNUSED_KEYS = {"description", "dblp", "date", "place", "comment", "abstract_deadline"}
+
+
+class TableLoader(Loader):
+    """Loader that skips constructing the fields listed in UNUSED_KEYS"""
+
+    def construct_mapping(self, node, deep=False):
+        node.value = [
+            (key, value) for key, value in node.value
+            if not (isinstance(key, yaml.ScalarNode) and key.value in UNUSED_KEYS)
+        ]
+        return super().construct_mapping(node, deep=deep)
+
 
 def parse_tz(tz):
     if tz == "AoE":
@@ -29,11 +45,11 @@ def parse_args():
     parser.add_argument("--rank", type=str, nargs='+', 
                         help="A list of ranks you want to filter, e.g.: '--rank C N'")
     args = parser.parse_args()
-    # Convert all arguments to lowercase
+    # Convert all arguments to lowercase sets for O(1) membership tests
     for arg_name in vars(args):
         arg_value = getattr(args, arg_name)
         if arg_value:
-            setattr(args, arg_name, [arg.lower() for arg in arg_value])
+            setattr(args, arg_name, {arg.lower() for arg in arg_value})
     return args
 
 
@@ -59,15 +75,16 @@ def format_duraton(ddl_time: datetime, now: datetime) -> str:
 
 def main():
     args = parse_args()
-    yml_str = requests.get(
-        "https://ccfddl.github.io/conference/allconf.yml").content.decode("utf-8")
-    all_conf = yaml.safe_load(yml_str)
+    yml_bytes = requests.get(
+        "https://ccfddl.github.io/conference/allconf.yml").content
+    all_conf = yaml.load(yml_bytes, Loader=TableLoader)
 
     all_conf_ext = []
     now = datetime.now(tz=timezone.utc)
     for conf in all_conf:
         for c in conf["confs"]:
-            cur_conf = deepcopy(conf)
+            # Copy only the conference-level fields; the per-year list is not needed
+            cur_conf = {k: v for k, v in conf.items() if k != "confs"}
             cur_conf["title"] = cur_conf["title"] + str(c["year"])
             cur_conf.update(c)
             time_obj = None
@@ -1,15 +1,54 @@
 import yaml
 import re
-import uuid
+import hashlib
+import functools
 from collections import defaultdict
+from pathlib import Path
+from typing import TextIO
 from itertools import combinations
 from datetime import datetime, timedelta, timezone
-from icalendar import Calendar, Event, Timezone, TimezoneStandard
+
+# 优先使用libyaml的C实现加速解析
+Loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+# 会议数据目录，基于脚本位置定位，不依赖当前工作目录
+CONFERENCE_DIR = Path(__file__).resolve().parents[2] / "conference"
+
+_TZ_RE = re.compile(r'UTC([+-])(\d{1,2})$')
+
+# 整点UTC偏移到TZID的映射，覆盖UTC-12至UTC+14，超出范围时现场格式化
+_TZID_TABLE = {h: f"UTC{h:+03d}:00" for h in range(-12, 15)}
+
+# 截止类型对应的(中文, 英文)名称，键的顺序即事件生成顺序
+_DEADLINE_LABELS = {
+    'abstract_deadline': ('摘要截稿', 'Abstract Deadline'),
+    'deadline': ('截稿日期', 'Deadline'),
+}
+
+# 事件描述各行模板：(会议时间, 会议地点, 原始截止时间, 分类, 会议官网, DBLP索引)
+_DESC_TEMPLATES = {
+    'en': (
+        "🗓️ Date: {}",
+        "📍 Location: {}",
+        "⏰ Original Deadline ({}): {}",
+        "Category: {} ({})",
+        "Conference Website: {}",
+        "DBLP Index: https://dblp.org/db/conf/{}",
+    ),
+    'zh': (
+        "🗓️ 会议时间: {}",
+        "📍 会议地点: {}",
+        "⏰ 原始截止时间 ({}): {}",
+        "分类: {} ({})",
+        "会议官网: {}",
+        "DBLP索引: https://dblp.org/db/conf/{}",
+    ),
+}
 
 # 中英类别映射表
-def load_mapping(path: str="conference/types.yml"):
-    with open(path) as f:
-        types = yaml.safe_load(f)
+def load_mapping(path: Path=CONFERENCE_DIR / "types.yml"):
+    with open(path, 'rb') as f:
+        types = yaml.load(f, Loader=Loader)
     SUB_MAPPING = {}
     for types_data in types:
         SUB_MAPPING[types_data['sub']] = types_data['name']
@@ -19,41 +58,109 @@ def get_timezone(tz_str: str) -> timezone:
     """将时区字符串转换为datetime.timezone对象"""
     if tz_str == 'AoE':
         return timezone(timedelta(hours=-12))
-    match = re.match(r'UTC([+-])(\d{1,2})$', tz_str)
+    match = _TZ_RE.match(tz_str)
     if not match:
         raise ValueError(f"无效的时区格式: {tz_str}")
     sign, hours = match.groups()
     offset = int(hours) if sign == '+' else -int(hours)
     return timezone(timedelta(hours=offset))
 
-def create_vtimezone(tz: timezone) -> Timezone:
-    """创建VTIMEZONE组件"""
+def format_tzid(offset_hours: float) -> str:
+    """将整点UTC偏移转换为TZID，VTIMEZONE与事件共用以保证一致"""
+    hours = int(offset_hours)
+    return _TZID_TABLE.get(hours) or f"UTC{hours:+03d}:00"
+
+@functools.lru_cache(maxsize=4096)
+def parse_deadline(deadline_str: str) -> tuple[datetime, bool]:
+    """解析截止时间字符串，返回(时间, 是否全天)，格式无效时抛出ValueError"""
+    try:
+        return datetime.strptime(deadline_str, '%Y-%m-%d %H:%M:%S'), False
+    except ValueError:
+        return datetime.strptime(deadline_str, '%Y-%m-%d'), True
+
+def escape_text(value) -> str:
+    """按RFC 5545转义TEXT类型的属性值"""
+    return str(value).replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,').replace('\n', '\\n')
+
+def fold_line(line: str) -> str:
+    """按RFC 5545将内容行折叠为每行不超过75字节，不拆分多字节字符"""
+    if len(line.encode()) <= 75:
+        return line + '\r\n'
+    chunks = []
+    start, size, limit = 0, 0, 75
+    for i, char in enumerate(line):
+        char_size = len(char.encode())
+        if size + char_size > limit:
+            chunks.append(line[start:i])
+            start, size, limit = i, 0, 74  # 续行开头的空格占一个字节
+        size += char_size
+    chunks.append(line[start:])
+    return '\r\n '.join(chunks) + '\r\n'
+
+@functools.lru_cache(maxsize=None)
+def create_vtimezone(tz: timezone) -> str:
+    """生成VTIMEZONE组件文本，同一时区只构造一次"""
     tz_offset = tz.utcoffset(datetime.now())
     offset_hours = tz_offset.total_seconds() // 3600
-    tzid = f"UTC{offset_hours:+03.0f}:00"
-
-    vtz = Timezone()
-    vtz.add('TZID', tzid)
-
-    std = TimezoneStandard()
-    std.add('DTSTART', datetime(1970, 1, 1))
-    std.add('TZOFFSETFROM', timedelta(hours=offset_hours))
-    std.add('TZOFFSETTO', timedelta(hours=offset_hours))
-    std.add('TZNAME', tzid)
+    tzid = format_tzid(offset_hours)
+    offset = f"{int(offset_hours):+03d}00"
+    return (
+        "BEGIN:VTIMEZONE\r\n"
+        f"TZID:{tzid}\r\n"
+        "BEGIN:STANDARD\r\n"
+        "DTSTART:19700101T000000\r\n"
+        f"TZNAME:{tzid}\r\n"
+        f"TZOFFSETFROM:{offset}\r\n"
+        f"TZOFFSETTO:{offset}\r\n"
+        "END:STANDARD\r\n"
+        "END:VTIMEZONE\r\n"
+    )
+
+def emit_event(out: TextIO, uid: str, dtstamp: datetime, dtstart, dtend, summary: str,
+               description: str, location: str, url: str, tzid: str, all_day: bool):
+    """将一个VEVENT组件的文本写入out，dtstamp须为UTC时间"""
+    out.write("BEGIN:VEVENT\r\n")
+    out.write(fold_line(f"SUMMARY:{escape_text(summary)}"))
+    if all_day:
+        out.write(f"DTSTART;VALUE=DATE:{dtstart:%Y%m%d}\r\n")
+        out.write(f"DTEND;VALUE=DATE:{dtend:%Y%m%d}\r\n")
+    else:
+        out.write(f'DTSTART;TZID="{tzid}":{dtstart:%Y%m%dT%H%M%S}\r\n')
+        out.write(f'DTEND;TZID="{tzid}":{dtend:%Y%m%dT%H%M%S}\r\n')
+    out.write(f"DTSTAMP:{dtstamp:%Y%m%dT%H%M%SZ}\r\n")
+    out.write(fold_line(f"UID:{uid}"))
+    out.write(fold_line(f"DESCRIPTION:{escape_text(description)}"))
+    out.write(fold_line(f"LOCATION:{escape_text(location)}"))
+    out.write(fold_line(f"URL:{url}"))
+    out.write("END:VEVENT\r\n")
+
+def load_yaml(file_path: Path) -> list[dict]:
+    with open(file_path, 'rb') as f:
+        return yaml.load(f, Loader=Loader)
+
+def load_conferences(file_paths: list[Path]) -> list[dict]:
+    """读取并解析全部会议文件，每个文件只解析一次"""
+    conferences = []
+    for file_path in file_paths:
+        conferences.extend(load_yaml(file_path))
+    return conferences
 
-    vtz.add_component(std)
-    return vtz
+def convert_to_ical(conferences: list[dict], output_path: str, lang: str='en', SUB_MAPPING={}):
+    # 语言在整个日历中固定，提前选好标签和描述模板
+    is_en = lang == 'en'
+    label_index = 1 if is_en else 0
+    date_tmpl, place_tmpl, deadline_tmpl, sub_tmpl, link_tmpl, dblp_tmpl = _DESC_TEMPLATES['en' if is_en else 'zh']
 
-def convert_to_ical(file_paths: list[str], output_path: str, lang: str='en', SUB_MAPPING={}):
-    cal = Calendar()
-    cal.add('prodid', '-//会议截止日历//ccfddl.com//')
-    cal.add('version', '2.0')
+    # 边生成边写入输出文件，内容行已自带CRLF
+    with open(output_path, 'w', encoding='utf-8', newline='') as out:
+        out.write("BEGIN:VCALENDAR\r\n")
+        out.write("VERSION:2.0\r\n")
+        out.write(fold_line("PRODID:-//会议截止日历//ccfddl.com//"))
 
-    added_tzids = set()
-    for file_path in file_paths:
-        with open(file_path, 'r') as f:
-            conferences = yaml.safe_load(f)
+        # 整个日历共用一个生成时间戳
+        now_utc = datetime.now(timezone.utc)
 
+        added_tzids = set()
         for conf_data in conferences:
             title = conf_data['title']
             sub = conf_data['sub']
@@ -61,161 +168,126 @@ def convert_to_ical(file_paths: list[str], output_path: str, lang: str='en', SUB
             rank = conf_data['rank']
             dblp = conf_data['dblp']
 
+            # 会议级别描述，同一会议的所有事件共用
+            level_parts = [f"CCF {rank['ccf']}"] if rank['ccf'] != "N" else []
+            if rank.get('core', 'N') != "N":
+                level_parts.append(f"CORE {rank['core']}")
+            if rank.get('thcpl', 'N') != "N":
+                level_parts.append(f"THCPL {rank['thcpl']}")
+            level_desc = ", ".join(level_parts) if level_parts else None
+            conf_desc = f"{conf_data['description']}"
+            sub_line = sub_tmpl.format(sub_chinese, sub)
+            dblp_line = dblp_tmpl.format(dblp)
+
             for conf in conf_data['confs']:
                 year = conf['year']
                 link = conf['link']
                 timeline = conf['timeline']
-                timezone = conf['timezone']
+                timezone_str = conf['timezone']
                 place = conf['place']
                 date = conf['date']
 
+                # 同一年份的截止日期共用时区
+                try:
+                    tz = get_timezone(timezone_str)
+                except ValueError:
+                    continue
+                tz_offset = tz.utcoffset(datetime.now())
+                offset_hours = tz_offset.total_seconds() // 3600
+                tzid = format_tzid(offset_hours)
+
+                # 描述中除截止时间外的各行，同一年份的事件共用
+                head_lines = [conf_desc] if conf_desc else []
+                head_lines.append(date_tmpl.format(date))
+                head_lines.append(place_tmpl.format(place))
+                desc_head = "\n".join(head_lines)
+                tail_lines = [sub_line]
+                if level_desc:
+                    tail_lines.append(level_desc)
+                tail_lines.append(link_tmpl.format(link))
+                tail_lines.append(dblp_line)
+                desc_tail = "\n".join(tail_lines)
+
+                # 添加VTIMEZONE组件
+                if timeline and tzid not in added_tzids:
+                    out.write(create_vtimezone(tz))
+                    added_tzids.add(tzid)
+
                 for entry in timeline:
-                    timezone_str = conf['timezone']
-                    try:
-                        tz = get_timezone(timezone_str)
-                    except ValueError:
-                        continue
-
-                    # 添加VTIMEZONE组件
-                    tz_offset = tz.utcoffset(datetime.now())
-                    offset_hours = tz_offset.total_seconds() // 3600
-                    tzid = f"UTC{offset_hours:+03.0f}:00"
-
-                    if tzid not in added_tzids:
-                        vtz = create_vtimezone(tz)
-                        cal.add_component(vtz)
-                        added_tzids.add(tzid)
-
-                    # 判断截止类型
-                    deadline_type, deadline_str = None, None
-                    if 'abstract_deadline' in entry:
-                        deadline_type = ('摘要截稿', 'Abstract Deadline')
-                        deadline_str = entry['abstract_deadline']
-                    elif 'deadline' in entry:
-                        deadline_type = ('截稿日期', 'Deadline')
-                        deadline_str = entry['deadline']
-                    else:
-                        continue  # 跳过无效条目
-
-                    if deadline_str == 'TBD':
-                        continue  # 忽略待定日期
-
-                    # 解析日期和时间
-                    is_all_day = False
-                    try:
-                        deadline_dt = datetime.strptime(deadline_str, '%Y-%m-%d %H:%M:%S')
-                    except ValueError:
+                    # 摘要截稿和截稿日期分别生成事件
+                    for deadline_key in _DEADLINE_LABELS:
+                        if deadline_key not in entry:
+                            continue
+                        deadline_type = _DEADLINE_LABELS[deadline_key]
+                        deadline_str = entry[deadline_key]
+
+                        if deadline_str == 'TBD':
+                            continue  # 忽略待定日期
+
+                        # 解析日期和时间
                         try:
-                            deadline_dt = datetime.strptime(deadline_str, '%Y-%m-%d')
-                            is_all_day = True
+                            deadline_dt, is_all_day = parse_deadline(deadline_str)
                         except ValueError:
                             continue  # 无效日期格式
 
-                    # 创建事件对象
-                    event = Event()
-                    event.add('uid', uuid.uuid4())
-                    event.add('dtstamp', datetime.now(get_timezone(timezone)))  # UTC时区感知
-
-                    # 处理时间字段
-                    if is_all_day:
-                        event.add('dtstart', deadline_dt.date())
-                        event.add('dtend', (deadline_dt + timedelta(days=1)).date())
-                    else:
-                        aware_dt = deadline_dt.replace(tzinfo=tz)
-                        event.add('dtstart', aware_dt)
-                        event.add('dtend', aware_dt + timedelta(minutes=1))
-
-                    # 构建中英双语摘要
-                    if lang == 'en':
-                        summary = f"{title} {year} {deadline_type[1]}"
-                    else:
-                        summary = f"{title} {year} {deadline_type[0]}"
-
-                    # 添加注释信息
-                    if 'comment' in entry:
-                        summary += f" [{entry['comment']}]"
-                    event.add('summary', summary)
-
-                    # 构建详细描述
-                    level_desc = [
-                        f"CCF {rank['ccf']}" if rank['ccf'] != "N" else None,
-                        f"CORE {rank['core']}" if rank.get('core', 'N') != "N" else None,
-                        f"THCPL {rank['thcpl']}" if rank.get('thcpl', 'N') != "N" else None,
-                    ]
-                    level_desc = [line for line in level_desc if line]
-                    if len(level_desc) > 0:
-                        level_desc = ", ".join(level_desc)
-                    else:
-                        level_desc = None
-                    if lang == 'en':
-                        description = [
-                            f"{conf_data['description']}",
-                            f"🗓️ Date: {date}",
-                            f"📍 Location: {place}",
-                            f"⏰ Original Deadline ({timezone}): {deadline_str}",
-                            f"Category: {sub_chinese} ({sub})",
-                            level_desc,
-                            f"Conference Website: {link}",
-                            f"DBLP Index: https://dblp.org/db/conf/{dblp}",
-                        ]
-                    else:
-                        description = [
-                            f"{conf_data['description']}",
-                            f"🗓️ 会议时间: {date}",
-                            f"📍 会议地点: {place}",
-                            f"⏰ 原始截止时间 ({timezone}): {deadline_str}",
-                            f"分类: {sub_chinese} ({sub})",
-                            level_desc,
-                            f"会议官网: {link}",
-                            f"DBLP索引: https://dblp.org/db/conf/{dblp}",
-                        ]
-                    description = [line for line in description if line]
-                    event.add('description', '\n'.join(description))
-
-                    # 添加其他元信息
-                    event.add('location', place)
-                    event.add('url', link)
-
-                    cal.add_component(event)
-
-    # 写入输出文件
-    with open(output_path, 'wb') as f:
-        f.write(cal.to_ical())
-
-
-def reverse_index(file_paths: list[str], subs: list[str]):
-    index = defaultdict(list)
+                        # 由会议信息生成稳定的UID，便于日历客户端在重新生成后去重
+                        uid_src = f"{title}-{year}-{deadline_key}-{deadline_str}-{entry.get('comment', '')}"
+                        uid = f"{hashlib.md5(uid_src.encode()).hexdigest()}@ccfddl.com"
 
-    for file_path in file_paths:
-        with open(file_path, 'r') as f:
-            conferences = yaml.safe_load(f)
+                        # 处理时间字段
+                        if is_all_day:
+                            dtstart = deadline_dt.date()
+                            dtend = (deadline_dt + timedelta(days=1)).date()
+                        else:
+                            dtstart = deadline_dt
+                            dtend = deadline_dt + timedelta(minutes=1)
 
-        for conf_data in conferences:
-            # title = conf_data['title']
-            sub = conf_data['sub']
-            rank = conf_data['rank']
+                        # 构建摘要，并添加注释信息
+                        summary = f"{title} {year} {deadline_type[label_index]}"
+                        if 'comment' in entry:
+                            summary += f" [{entry['comment']}]"
+
+                        # 构建详细描述
+                        deadline_line = deadline_tmpl.format(timezone_str, deadline_str)
+                        description = f"{desc_head}\n{deadline_line}\n{desc_tail}"
+
+                        emit_event(out, uid, now_utc, dtstart, dtend, summary, description,
+                                   place, link, tzid, is_all_day)
+
+        out.write("END:VCALENDAR\r\n")
+
+
+def reverse_index(conferences: list[dict], subs: list[str]):
+    index = defaultdict(list)
 
-            # index[title].append(file_path)
-            rank_keys = [
-                'ccf_' + rank.get('ccf', 'N'),
-                'core_' + rank.get('core', 'N'),
-                'thcpl_' + rank.get('thcpl', 'N'),
-            ]
-            for key in rank_keys:
-                index[key].append(file_path)
-                index[key + '_' + sub].append(file_path)
-            index[sub].append(file_path)
+    for conf_data in conferences:
+        # title = conf_data['title']
+        sub = conf_data['sub']
+        rank = conf_data['rank']
+
+        # index[title].append(conf_data)
+        rank_keys = [
+            'ccf_' + rank.get('ccf', 'N'),
+            'core_' + rank.get('core', 'N'),
+            'thcpl_' + rank.get('thcpl', 'N'),
+        ]
+        for key in rank_keys:
+            index[key].append(conf_data)
+            index[key + '_' + sub].append(conf_data)
+        index[sub].append(conf_data)
 
     return index
 
 
 if __name__ == '__main__':
-    from xlin import ls, element_mapping
-    SUB_MAPPING = load_mapping("conference/types.yml")
-    paths = ls("conference", filter=lambda f: f.name != "types.yml")
-    index = reverse_index(paths, list(SUB_MAPPING.keys()))
+    from xlin import element_mapping
+    SUB_MAPPING = load_mapping()
+    # 与原先的列举方式一致：除types.yml外的所有文件（部分数据文件没有.yml后缀）
+    paths = sorted(path for path in CONFERENCE_DIR.rglob("*") if path.is_file() and path.name != "types.yml")
+    conferences = load_conferences(paths)
+    index = reverse_index(conferences, list(SUB_MAPPING.keys()))
     for lang in ['zh', 'en']:
-        convert_to_ical(paths, f'deadlines_{lang}.ics', lang, SUB_MAPPING)
+        convert_to_ical(conferences, f'deadlines_{lang}.ics', lang, SUB_MAPPING)
         f = lambda key: (len(index[key]) > 0, convert_to_ical(index[key], f'deadlines_{lang}_{key}.ics', lang, SUB_MAPPING))
         element_mapping(index.keys(), f, thread_pool_size=8)
     print("转换完成")